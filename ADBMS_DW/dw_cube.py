@@ -0,0 +1,239 @@
+# dw_cube.py
+# Precomputed OLAP cube over the warehouse star schema.
+#
+# build_cube() joins fact_appointments with dim_time / dim_doctor / dim_patient
+# once and stores SUM(appointment_count) as a dense array over
+# (year, month, specialization, gender, age_group). Each build writes a new
+# versioned dw_cube.<stamp>.npy and then atomically replaces dw_cube.json, which
+# holds the labels of each dimension and the name of the matching array file.
+# A reader therefore always sees labels and array from the same build.
+#
+# Cube.load() opens the array with mmap_mode="r", so every worker process that
+# loads the same file shares the OS page cache instead of holding its own copy.
+# Roll-up / drill-down / slice / dice are then just index + sum on that array.
+#
+#   python dw_cube.py build
+#   python dw_cube.py query --by year
+#   python dw_cube.py query --by month --where year=2025 --where specialization=Cardiology
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DW_DB = os.path.join(BASE_DIR, "dw_hospital.db")
+CUBE_PATH = os.path.join(BASE_DIR, "dw_cube.json")
+KEEP_VERSIONS = 2  # older array files are removed; the previous one stays for in-flight loads
+
+DIMENSIONS = ("year", "month", "specialization", "gender", "age_group")
+UNKNOWN = "Unknown"
+
+# one row per fact, already reduced to the five cube dimensions; year and month
+# both come from dim_time.date so they always describe the same day (the ETL's
+# dim_time.year is a constant 2025 even for 2026+ dates), falling back to the
+# dim_time.year / dim_time.month columns only when date is missing or unparsable
+FACT_SQL = """
+    SELECT COALESCE(CAST(strftime('%Y', t.date) AS INTEGER), t.year),
+           COALESCE(CAST(strftime('%m', t.date) AS INTEGER), t.month),
+           d.specialization,
+           p.gender,
+           p.age_group,
+           SUM(f.appointment_count)
+    FROM fact_appointments f
+    LEFT JOIN dim_time t ON f.time_id = t.time_id
+    LEFT JOIN dim_doctor d ON f.doctor_id = d.doctor_id
+    LEFT JOIN dim_patient p ON f.patient_id = p.patient_id
+    GROUP BY 1, 2, 3, 4, 5
+"""
+
+
+def _versions(cube_path):
+    return sorted(glob.glob(os.path.splitext(cube_path)[0] + ".*.npy"))
+
+# -------------------------
+# build (run after each warehouse load)
+# -------------------------
+def build_cube(db_path=DW_DB, cube_path=CUBE_PATH):
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(FACT_SQL).fetchall()
+
+    # label -> code per dimension; labels sorted so axes read naturally
+    labels = []
+    for i in range(len(DIMENSIONS)):
+        vals = {UNKNOWN if r[i] is None else r[i] for r in rows}
+        labels.append(sorted(vals, key=lambda v: (isinstance(v, str), v)))
+    codes = [{v: c for c, v in enumerate(lab)} for lab in labels]
+
+    shape = tuple(max(len(lab), 1) for lab in labels)
+    cube = np.zeros(shape, dtype=np.int64)
+    if rows:
+        idx = tuple(
+            np.array([codes[i][UNKNOWN if r[i] is None else r[i]] for r in rows], dtype=np.intp)
+            for i in range(len(DIMENSIONS))
+        )
+        counts = np.array([r[-1] or 0 for r in rows], dtype=np.int64)
+        np.add.at(cube, idx, counts)
+
+    # the array goes to a fresh versioned file; swapping the pointer file is the
+    # single atomic step, so readers see either the old build or the new one
+    stem = os.path.splitext(cube_path)[0]
+    data_path = f"{stem}.{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}.npy"
+    with open(data_path, "wb") as fh:
+        np.save(fh, cube)
+    tmp_meta = cube_path + ".tmp"
+    with open(tmp_meta, "w") as fh:
+        json.dump({"dimensions": list(DIMENSIONS), "labels": labels,
+                   "data": os.path.basename(data_path)}, fh)
+    os.replace(tmp_meta, cube_path)
+
+    # processes that already mapped an old array keep their pages after unlink
+    for old in _versions(cube_path)[:-KEEP_VERSIONS]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+    return cube_path
+
+# -------------------------
+# query API
+# -------------------------
+class Cube:
+    def __init__(self, data, dimensions, labels):
+        self.data = data
+        self.dimensions = tuple(dimensions)
+        self.labels = [list(lab) for lab in labels]
+        self._axis = {d: i for i, d in enumerate(self.dimensions)}
+        self._codes = [{v: c for c, v in enumerate(lab)} for lab in self.labels]
+        # query strings from the CLI / URLs: "2025" should match 2025
+        self._str_codes = [{str(v): c for c, v in enumerate(lab)} for lab in self.labels]
+
+    @classmethod
+    def load(cls, cube_path=CUBE_PATH, retries=3):
+        for attempt in range(retries + 1):
+            with open(cube_path) as fh:
+                meta = json.load(fh)
+            try:
+                data = np.load(os.path.join(os.path.dirname(cube_path), meta["data"]), mmap_mode="r")
+            except FileNotFoundError:
+                data = None  # pruned by a rebuild between the two reads
+            expected = tuple(max(len(lab), 1) for lab in meta["labels"])
+            if data is not None and data.shape == expected:
+                return cls(data, meta["dimensions"], meta["labels"])
+            if attempt < retries:
+                time.sleep(0.05)
+        raise RuntimeError(f"OLAP cube at {cube_path} is inconsistent; rebuild it")
+
+    def _code(self, axis, value):
+        code = self._codes[axis].get(value)
+        return code if code is not None else self._str_codes[axis].get(str(value))
+
+    def query(self, by=(), where=None):
+        """Sum the cube grouped by `by`, restricted to `where` {dim: value or [values]}.
+
+        Returns the grand total when `by` is empty, otherwise a dict keyed by
+        label tuples (plain labels for a single dimension), zero cells omitted.
+        """
+        if isinstance(by, str):
+            by = (by,)
+        if len(set(by)) != len(by):
+            raise ValueError(f"repeated dimension in by: {', '.join(by)}")
+        where = where or {}
+        for d in list(by) + list(where):
+            if d not in self._axis:
+                raise KeyError(f"unknown dimension: {d}")
+
+        index = []
+        for axis, dim in enumerate(self.dimensions):
+            if dim not in where:
+                index.append(slice(None))
+                continue
+            wanted = where[dim]
+            if not isinstance(wanted, (list, tuple, set)):
+                wanted = [wanted]
+            # dict.fromkeys drops repeats ("2025" and 2025 are the same cell)
+            found = dict.fromkeys(c for c in (self._code(axis, v) for v in wanted) if c is not None)
+            index.append(np.array(list(found), dtype=np.intp))
+
+        # apply selections one axis at a time so each stays a cheap take()
+        sub = self.data
+        for axis, ix in enumerate(index):
+            if not isinstance(ix, slice):
+                sub = np.take(sub, ix, axis=axis)
+
+        keep = [self._axis[d] for d in by]
+        drop = tuple(a for a in range(len(self.dimensions)) if a not in keep)
+        summed = sub.sum(axis=drop)
+        if not keep:
+            return int(summed)
+
+        # summed axes are in cube order; reorder to the order asked for
+        order = sorted(keep)
+        summed = np.transpose(summed, [order.index(a) for a in keep])
+        axis_labels = []
+        for a in keep:
+            ix = index[a]
+            lab = self.labels[a]
+            axis_labels.append(lab if isinstance(ix, slice) else [lab[c] for c in ix])
+
+        out = {}
+        for pos in zip(*np.nonzero(summed)):
+            key = tuple(axis_labels[k][p] for k, p in enumerate(pos))
+            out[key[0] if len(key) == 1 else key] = int(summed[pos])
+        return out
+
+    # the usual OLAP verbs, as in dw_olap_queries.sql
+    def roll_up(self, dim, where=None):
+        return self.query((dim,), where)
+
+    def drill_down(self, dims, where=None):
+        return self.query(tuple(dims), where)
+
+    def slice(self, dim, value, by=()):
+        return self.query(by, {dim: value})
+
+    def dice(self, where, by=()):
+        return self.query(by, where)
+
+# -------------------------
+# CLI
+# -------------------------
+def _parse_where(items):
+    where = {}
+    for item in items or []:
+        dim, _, value = item.partition("=")
+        where.setdefault(dim, []).append(value)
+    return where
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warehouse OLAP cube")
+    parser.add_argument("--db", default=DW_DB)
+    parser.add_argument("--cube", default=CUBE_PATH)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="rebuild the cube from the warehouse")
+    q = sub.add_parser("query", help="aggregate the cube")
+    q.add_argument("--by", action="append", default=[], choices=DIMENSIONS)
+    q.add_argument("--where", action="append", metavar="DIM=VALUE")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        build_cube(args.db, args.cube)
+        print(f"✅ OLAP cube written to {args.cube}")
+        return
+
+    result = Cube.load(args.cube).query(args.by, _parse_where(args.where))
+    if isinstance(result, dict):
+        for key, total in result.items():
+            print(key, total)
+    else:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
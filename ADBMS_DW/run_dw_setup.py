@@ -62,4 +62,8 @@ END;
 conn.commit()
 conn.close()
 
+# 4. OLAP CUBE (rebuild after every load)
+from dw_cube import build_cube
+build_cube("dw_hospital.db", "dw_cube.json")
+
 print("✅ Data Warehouse setup completed successfully")
@@ -0,0 +1,309 @@
+# analytics.py
+# Fusion Prime Care Hospital - doctor capacity & utilization analytics (NumPy)
+# Used by the /reports/utilization endpoint in app.py, or run directly:
+#   python analytics.py --start 2025-12-01 --end 2026-01-31
+#   python analytics.py --bench 5000000
+
+import argparse
+import itertools
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+# DB file paths (same layout as app.py)
+DATA_DIR = "."
+DOCTOR_DB = os.path.join(DATA_DIR, "doctor.db")
+APPOINT_DB = os.path.join(DATA_DIR, "appointment.db")
+
+# appointment.status values get a fixed integer code; anything else is OTHER
+STATUSES = ("CONFIRMED", "PENDING", "CANCELLED", "NO_SHOW", "OTHER")
+STATUS_CODE = {s: i for i, s in enumerate(STATUSES)}
+OTHER = STATUS_CODE["OTHER"]
+
+# largest doctor-id span indexed with a lookup table instead of np.unique
+LUT_MAX_SPAN = 1 << 20
+
+# default (open) date range
+FIRST_DATE = "0000-01-01"
+LAST_DATE = "9999-12-31"
+
+# -------------------------
+# bulk loading
+# -------------------------
+# SQLite encodes each row as a single packed integer - dates as days since
+# 1970-01-01, times as minutes after midnight - so the cursor yields one
+# Python int per row and is drained straight into an int64 buffer, which is
+# then split into columns with shifts and masks. Boxing one value per row
+# instead of four cuts load time by about a quarter on large tables.
+#   bits 0-2   status code / is_available
+#   bits 3-13  minute of day (0 when missing, clamped to 2047)
+#   bits 14-33 day number + 1 (0 when the date is missing, malformed or before 1970)
+#   bits 34-62 doctor_id + 1 (0 when missing or out of range)
+# Every field is clamped in SQL before it is shifted, so a bad value in one
+# column can never spill into the bits of another: (max(-1, min(x, M)) + 1) % (M + 1)
+# maps x in [0, M) to x + 1 and anything else (negative, too large, NULL) to 0,
+# while evaluating x only once.
+_FLAG_BITS, _MINUTE_BITS, _DAY_BITS, _DOCTOR_BITS = 3, 11, 20, 29
+_MINUTE_SHIFT = _FLAG_BITS
+_DAY_SHIFT = _MINUTE_SHIFT + _MINUTE_BITS
+_DOCTOR_SHIFT = _DAY_SHIFT + _DAY_BITS
+
+_PACK = """
+    SELECT (COALESCE((max(-1, min({doctor}, {dmax})) + 1) % ({dmax} + 1), 0) << {ds})
+         | (COALESCE((max(-1, min(CAST(julianday({date}) - 2440587.5 AS INTEGER), {jmax})) + 1) % ({jmax} + 1), 0) << {dy})
+         | (COALESCE(max(0, min(CAST(substr({time},1,2) AS INTEGER)*60 + CAST(substr({time},4,2) AS INTEGER), {mmax})), 0) << {ms})
+         | (COALESCE({flag}, 0) & {fmask})
+    FROM {table}
+    WHERE {date} BETWEEN ? AND ?
+"""
+
+_BITS = dict(
+    ds=_DOCTOR_SHIFT, dy=_DAY_SHIFT, ms=_MINUTE_SHIFT,
+    dmax=(1 << _DOCTOR_BITS) - 1, jmax=(1 << _DAY_BITS) - 1,
+    mmax=(1 << _MINUTE_BITS) - 1, fmask=(1 << _FLAG_BITS) - 1,
+)
+
+SLOT_SQL = _PACK.format(
+    doctor="doctor_id", date="slot_date", time="start_time", table="slot",
+    flag="COALESCE(is_available, 1) & 1", **_BITS,
+)
+
+APPOINT_SQL = _PACK.format(
+    doctor="doctor_id", date="appt_date", time="appt_time", table="appointment",
+    flag="""CASE UPPER(status)
+                WHEN 'CONFIRMED' THEN 0
+                WHEN 'PENDING' THEN 1
+                WHEN 'CANCELLED' THEN 2
+                WHEN 'NO_SHOW' THEN 3
+                WHEN 'NO-SHOW' THEN 3
+                ELSE 4
+            END""", **_BITS,
+)
+
+
+def _fetch_packed(db_path, sql, params):
+    with sqlite3.connect(db_path) as conn:
+        cur = conn.execute(sql, params)
+        packed = np.fromiter(itertools.chain.from_iterable(cur), dtype=np.int64)
+    return {
+        "doctor_id": (packed >> _DOCTOR_SHIFT) - 1,
+        "day": ((packed >> _DAY_SHIFT) & ((1 << _DAY_BITS) - 1)) - 1,
+        "minute": (packed >> _MINUTE_SHIFT) & ((1 << _MINUTE_BITS) - 1),
+        "flag": packed & ((1 << _FLAG_BITS) - 1),
+    }
+
+
+def load_slots(start, end, db_path=DOCTOR_DB):
+    cols = _fetch_packed(db_path, SLOT_SQL, (start, end))
+    cols["is_available"] = cols.pop("flag")
+    return cols
+
+
+def load_appointments(start, end, db_path=APPOINT_DB):
+    cols = _fetch_packed(db_path, APPOINT_SQL, (start, end))
+    cols["status"] = cols.pop("flag")
+    return cols
+
+
+def load_doctors(db_path=DOCTOR_DB):
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT doctor_id,name,specialization FROM doctor").fetchall()
+    return {r[0]: {"name": r[1], "specialization": r[2] or "Unspecified"} for r in rows}
+
+# -------------------------
+# vectorized group-bys
+# -------------------------
+def _rate(num, den):
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+
+def compute_utilization(slots, appts, doctors):
+    """Per-doctor / per-specialization / per-hour metrics from column arrays."""
+    # rows with a missing / out-of-range doctor (decoded as -1) belong to no
+    # doctor; count them once as "unassigned" and leave them out of the group-bys
+    s_ok = slots["doctor_id"] >= 0
+    a_ok = appts["doctor_id"] >= 0
+    unassigned = {"slots": int((~s_ok).sum()), "appointments": int((~a_ok).sum())}
+    if unassigned["slots"]:
+        slots = {k: v[s_ok] for k, v in slots.items()}
+    if unassigned["appointments"]:
+        appts = {k: v[a_ok] for k, v in appts.items()}
+
+    # dense doctor index over every doctor seen in either table; doctor ids are
+    # usually small integers, so a lookup table beats sorting millions of rows
+    known = np.fromiter(doctors.keys(), dtype=np.int64, count=len(doctors))
+    cols = [c for c in (known, slots["doctor_id"], appts["doctor_id"]) if len(c)]
+    lo = min(int(c.min()) for c in cols) if cols else 0
+    hi = max(int(c.max()) for c in cols) if cols else 0
+    if hi - lo + 1 <= max(LUT_MAX_SPAN, 64 * len(known)):
+        present = np.zeros(hi - lo + 1, dtype=bool)
+        for c in cols:
+            present[c - lo] = True
+        ids = np.flatnonzero(present) + lo
+        lut = np.cumsum(present) - 1
+        s_idx = lut[slots["doctor_id"] - lo]
+        a_idx = lut[appts["doctor_id"] - lo]
+    else:
+        # sparse ids (one stray id near 2^29 would need a ~512 MB table): sort instead
+        ids, inverse = np.unique(np.concatenate([known, slots["doctor_id"], appts["doctor_id"]]),
+                                 return_inverse=True)
+        nk, ns = len(known), len(slots["doctor_id"])
+        s_idx = inverse[nk:nk + ns]
+        a_idx = inverse[nk + ns:]
+    n = len(ids)
+
+    offered = np.bincount(s_idx, minlength=n)
+    booked = np.bincount(s_idx[slots["is_available"] == 0], minlength=n)
+
+    # doctor x status counts in one pass
+    nstat = len(STATUSES)
+    status = np.clip(appts["status"], 0, OTHER)
+    by_status = np.bincount(a_idx * nstat + status, minlength=n * nstat).reshape(n, nstat)
+    total_appts = by_status.sum(axis=1)
+
+    # doctor x hour for attended/booked demand (cancelled excluded)
+    live = status != STATUS_CODE["CANCELLED"]
+    hour = np.clip(appts["minute"][live] // 60, 0, 23)
+    by_hour = np.bincount(a_idx[live] * 24 + hour, minlength=n * 24).reshape(n, 24)
+
+    # doctor -> specialization index, then roll doctor rows up
+    spec_names = sorted({d["specialization"] for d in doctors.values()} | {"Unspecified"})
+    spec_code = {s: i for i, s in enumerate(spec_names)}
+    unspec = spec_code["Unspecified"]
+    doc_spec = np.array([spec_code[doctors[i]["specialization"]] if i in doctors else unspec
+                         for i in ids.tolist()], dtype=np.int64)
+    nspec = len(spec_names)
+    spec_offered = np.bincount(doc_spec, weights=offered, minlength=nspec)
+    spec_booked = np.bincount(doc_spec, weights=booked, minlength=nspec)
+    spec_status = np.zeros((nspec, nstat), dtype=np.int64)
+    np.add.at(spec_status, doc_spec, by_status)
+    spec_total = spec_status.sum(axis=1)
+
+    util = _rate(booked, offered)
+    cancel = _rate(by_status[:, STATUS_CODE["CANCELLED"]], total_appts)
+    no_show = _rate(by_status[:, STATUS_CODE["NO_SHOW"]], total_appts)
+    spec_util = _rate(spec_booked, spec_offered)
+    spec_cancel = _rate(spec_status[:, STATUS_CODE["CANCELLED"]], spec_total)
+    spec_no_show = _rate(spec_status[:, STATUS_CODE["NO_SHOW"]], spec_total)
+
+    hourly = by_hour.sum(axis=0)
+    peak_doc = by_hour.argmax(axis=1)
+    has_demand = by_hour.max(axis=1) > 0
+
+    doctor_rows = []
+    for i, did in enumerate(ids.tolist()):
+        if offered[i] == 0 and total_appts[i] == 0:
+            continue
+        info = doctors.get(did, {"name": f"Doctor #{did}", "specialization": "Unspecified"})
+        doctor_rows.append({
+            "doctor_id": did,
+            "name": info["name"],
+            "specialization": info["specialization"],
+            "slots_offered": int(offered[i]),
+            "slots_booked": int(booked[i]),
+            "utilization": round(float(util[i]), 4),
+            "appointments": int(total_appts[i]),
+            "status_counts": {s: int(c) for s, c in zip(STATUSES, by_status[i])},
+            "cancel_rate": round(float(cancel[i]), 4),
+            "no_show_rate": round(float(no_show[i]), 4),
+            "peak_hour": int(peak_doc[i]) if has_demand[i] else None,
+        })
+
+    spec_rows = []
+    for j, name in enumerate(spec_names):
+        if spec_offered[j] == 0 and spec_total[j] == 0:
+            continue
+        spec_rows.append({
+            "specialization": name,
+            "slots_offered": int(spec_offered[j]),
+            "slots_booked": int(spec_booked[j]),
+            "utilization": round(float(spec_util[j]), 4),
+            "appointments": int(spec_total[j]),
+            "status_counts": {s: int(c) for s, c in zip(STATUSES, spec_status[j])},
+            "cancel_rate": round(float(spec_cancel[j]), 4),
+            "no_show_rate": round(float(spec_no_show[j]), 4),
+        })
+
+    top = np.argsort(-hourly, kind="stable")[:3]
+    return {
+        "doctors": doctor_rows,
+        "specializations": spec_rows,
+        "hourly_appointments": [int(c) for c in hourly],
+        "peak_hours": [int(h) for h in top if hourly[h] > 0],
+        "unassigned": unassigned,
+    }
+
+
+def utilization_report(start, end, doctor_db=DOCTOR_DB, appoint_db=APPOINT_DB):
+    t0 = time.perf_counter()
+    slots = load_slots(start, end, doctor_db)
+    appts = load_appointments(start, end, appoint_db)
+    doctors = load_doctors(doctor_db)
+    t1 = time.perf_counter()
+    report = compute_utilization(slots, appts, doctors)
+    t2 = time.perf_counter()
+    report["range"] = {"start": start, "end": end}
+    report["rows"] = {"slots": int(len(slots["doctor_id"])), "appointments": int(len(appts["doctor_id"]))}
+    report["timings_ms"] = {"load": round((t1 - t0) * 1000, 2), "compute": round((t2 - t1) * 1000, 2)}
+    return report
+
+# -------------------------
+# synthetic benchmark
+# -------------------------
+def synthetic_columns(n_slots, n_doctors=500, n_specs=25, days=365, seed=0):
+    rng = np.random.default_rng(seed)
+    doctors = {i: {"name": f"Doctor #{i}", "specialization": f"Spec-{i % n_specs}"}
+               for i in range(1, n_doctors + 1)}
+    slots = {
+        "doctor_id": rng.integers(1, n_doctors + 1, n_slots),
+        "day": rng.integers(0, days, n_slots),
+        "minute": rng.integers(8 * 2, 20 * 2, n_slots) * 30,
+        "is_available": (rng.random(n_slots) > 0.7).astype(np.int64),
+    }
+    booked = slots["is_available"] == 0
+    appts = {
+        "doctor_id": slots["doctor_id"][booked],
+        "day": slots["day"][booked],
+        "minute": slots["minute"][booked],
+        "status": rng.choice(4, int(booked.sum()), p=[0.8, 0.05, 0.1, 0.05]),
+    }
+    return slots, appts, doctors
+
+
+def benchmark(n_slots, repeat=3):
+    slots, appts, doctors = synthetic_columns(n_slots)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        compute_utilization(slots, appts, doctors)
+        best = min(best, time.perf_counter() - t0)
+    return {"slots": n_slots, "appointments": int(len(appts["doctor_id"])),
+            "doctors": len(doctors), "compute_ms": round(best * 1000, 2)}
+
+# -------------------------
+# CLI
+# -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Doctor capacity & utilization report")
+    parser.add_argument("--start", default=FIRST_DATE, help="first date (YYYY-MM-DD)")
+    parser.add_argument("--end", default=LAST_DATE, help="last date (YYYY-MM-DD)")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory holding doctor.db / appointment.db")
+    parser.add_argument("--bench", type=int, metavar="N", help="time compute on N synthetic slots instead")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        out = benchmark(args.bench)
+    else:
+        out = utilization_report(args.start, args.end,
+                                 os.path.join(args.data_dir, "doctor.db"),
+                                 os.path.join(args.data_dir, "appointment.db"))
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+# api.py
+# Fusion Prime Care Hospital - JSON REST API (v1) over the existing tables
+#
+#   POST   /api/v1/login                         {"username": ..., "password": ...}
+#   GET    /api/v1/<entity>?fields=a,b&after=<id>&limit=100&<field>=<value>
+#   GET    /api/v1/<entity>/<id>?fields=a,b
+#   POST   /api/v1/<entity>/batch                [{...}, ...]          create
+#   PATCH  /api/v1/<entity>/batch                [{"<pk>": id, ...}]   update
+#   DELETE /api/v1/<entity>/batch                [id, ...]             delete
+#
+# <entity> is one of patients, doctors, slots, appointments. Lists use keyset
+# paging on the primary key: pass the returned "next_after" as ?after= to get
+# the next page. Every batch runs in a single transaction - one bad record
+# rolls back the whole batch. Responses are compact JSON, gzip-compressed
+# when the client accepts gzip. Request bodies must be application/json
+# (which also keeps plain cross-site form posts out) and may be sent with
+# Content-Encoding: gzip, up to MAX_BODY_BYTES once decoded.
+#
+# Appointments follow the booking forms: every appointment needs a free slot of
+# its doctor and takes that slot's date/time. Slot availability is read-only
+# here and only changes through appointment batches; booked slots can't be
+# moved to another doctor/time or deleted.
+
+import gzip
+import json
+import os
+import sqlite3
+import zlib
+from datetime import datetime
+
+from flask import Blueprint, Response, request, session
+from werkzeug.exceptions import HTTPException
+from werkzeug.security import check_password_hash
+
+# DB file paths (same layout as app.py)
+DATA_DIR = "."
+PATIENT_DB = os.path.join(DATA_DIR, "patient.db")
+DOCTOR_DB = os.path.join(DATA_DIR, "doctor.db")
+APPOINT_DB = os.path.join(DATA_DIR, "appointment.db")
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_BATCH = 1000
+GZIP_MIN_BYTES = 512
+MAX_BODY_BYTES = 8 * 1024 * 1024  # after gzip decoding
+
+ENTITIES = {
+    "patients": {
+        "db": PATIENT_DB, "table": "patient", "pk": "patient_id",
+        "fields": ("patient_id", "name", "gender", "phone", "address", "age", "disease", "dob", "email"),
+        "ints": ("age",),
+        "required": ("name",),
+    },
+    "doctors": {
+        "db": DOCTOR_DB, "table": "doctor", "pk": "doctor_id",
+        "fields": ("doctor_id", "name", "gender", "phone", "specialization", "age", "date_of_joining",
+                   "hospital_id", "email"),
+        "ints": ("age",),
+        "required": ("name", "hospital_id"),
+    },
+    "slots": {
+        "db": DOCTOR_DB, "table": "slot", "pk": "slot_id",
+        "fields": ("slot_id", "doctor_id", "slot_date", "start_time", "end_time", "is_available"),
+        "ints": ("doctor_id", "is_available"),
+        "required": ("doctor_id", "slot_date", "start_time"),
+        # availability only changes through appointment batches
+        "read_only": ("is_available",),
+    },
+    "appointments": {
+        "db": APPOINT_DB, "table": "appointment", "pk": "appointment_id",
+        "fields": ("appointment_id", "patient_id", "doctor_id", "slot_id", "appt_date", "appt_time",
+                   "status", "created_at"),
+        "ints": ("patient_id", "doctor_id", "slot_id"),
+        "required": ("patient_id", "doctor_id", "slot_id"),
+    },
+}
+
+api = Blueprint("api_v1", __name__, url_prefix="/api/v1")
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+# -------------------------
+# request / response helpers
+# -------------------------
+def json_response(payload, status=200):
+    body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    resp = Response(body, status=status, mimetype="application/json")
+    resp.vary.add("Accept-Encoding")
+    if len(body) >= GZIP_MIN_BYTES and request.accept_encodings["gzip"] > 0:
+        resp.set_data(gzip.compress(body, compresslevel=5))
+        resp.headers["Content-Encoding"] = "gzip"
+    return resp
+
+
+@api.errorhandler(ApiError)
+def _api_error(e):
+    return json_response({"error": e.message}, e.status)
+
+
+@api.app_errorhandler(HTTPException)
+def _http_error(e):
+    # routing errors (unknown URL, wrong method) never reach the blueprint's
+    # own handlers, so catch them app-wide and answer JSON for API paths only
+    if e.code is None or e.code < 400 or not request.path.startswith(api.url_prefix + "/"):
+        return e
+    resp = json_response({"error": e.description}, e.code)
+    if e.code == 405:
+        resp.headers["Allow"] = e.get_response().headers.get("Allow", "")
+    return resp
+
+
+def _body():
+    if request.mimetype != "application/json":
+        raise ApiError("Content-Type must be application/json.", 415)
+    if (request.content_length or 0) > MAX_BODY_BYTES:
+        raise ApiError("Request body too large.", 413)
+    raw = request.get_data()
+    if request.headers.get("Content-Encoding", "").lower() == "gzip":
+        # decode at most MAX_BODY_BYTES + 1 so a small gzip bomb can't exhaust memory
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            raw = inflater.decompress(raw, MAX_BODY_BYTES + 1)
+        except zlib.error:
+            raise ApiError("Invalid gzip body.")
+        if len(raw) > MAX_BODY_BYTES or inflater.unconsumed_tail:
+            raise ApiError("Request body too large.", 413)
+        if not inflater.eof:
+            raise ApiError("Invalid gzip body.")
+    try:
+        return json.loads(raw or b"null")
+    except ValueError:
+        raise ApiError("Invalid JSON body.")
+
+
+def _entity(name):
+    ent = ENTITIES.get(name)
+    if not ent:
+        raise ApiError(f"Unknown entity: {name}", 404)
+    return ent
+
+
+def _projection(ent):
+    fields = request.args.get("fields")
+    if not fields:
+        return list(ent["fields"])
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in ent["fields"]]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+    return wanted
+
+
+def _int_arg(name, default):
+    value = request.args.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(f"{name} must be an integer.")
+
+
+def _clean(ent, record, allow_pk=False):
+    if not isinstance(record, dict):
+        raise ApiError("Each record must be a JSON object.")
+    unknown = [k for k in record if k not in ent["fields"] or (k == ent["pk"] and not allow_pk)
+               or k in ent.get("read_only", ())]
+    if unknown:
+        raise ApiError(f"Unknown or read-only fields: {', '.join(unknown)}")
+    nested = [k for k, v in record.items() if isinstance(v, (dict, list))]
+    if nested:
+        raise ApiError(f"Fields must be scalar values: {', '.join(nested)}")
+    out = dict(record)
+    for k in ent["ints"]:
+        if out.get(k) not in (None, ""):
+            try:
+                out[k] = int(out[k])
+            except (TypeError, ValueError):
+                raise ApiError(f"{k} must be an integer.")
+    return out
+
+
+def _batch(ent):
+    records = _body()
+    if not isinstance(records, list) or not records:
+        raise ApiError("Body must be a non-empty JSON array.")
+    if len(records) > MAX_BATCH:
+        raise ApiError(f"At most {MAX_BATCH} records per batch.", 413)
+    return records
+
+
+def _connect(ent):
+    # used as a context manager: commit on success, roll back on any error
+    conn = sqlite3.connect(ent["db"])
+    if ent["table"] == "appointment":
+        # slot availability lives in doctor.db; attaching it keeps the
+        # appointment and slot changes in one transaction
+        conn.execute("ATTACH DATABASE ? AS doc", (DOCTOR_DB,))
+    # take the write lock up front so every read in the batch sees the rows
+    # it is about to change, with no other writer in between
+    conn.execute("BEGIN IMMEDIATE")
+    return conn
+
+
+# errors from bad values that only show up once SQLite sees them
+_DB_VALUE_ERRORS = (sqlite3.InterfaceError, sqlite3.ProgrammingError)
+
+# -------------------------
+# auth
+# -------------------------
+@api.route("/login", methods=["POST"])
+def login():
+    data = _body() or {}
+    if not isinstance(data, dict):
+        raise ApiError("Body must be a JSON object.")
+    with sqlite3.connect(APPOINT_DB) as conn:
+        row = conn.execute("SELECT user_id,username,password_hash,fullname FROM users WHERE username = ?",
+                           (str(data.get("username", "")).strip(),)).fetchone()
+    if not row or not check_password_hash(row[2], str(data.get("password", ""))):
+        raise ApiError("Invalid credentials.", 401)
+    session["user"] = {"user_id": row[0], "username": row[1], "fullname": row[3]}
+    return json_response({"user": session["user"]})
+
+# -------------------------
+# read: keyset-paged list + single record
+# -------------------------
+@api.route("/<entity>", methods=["GET"])
+def list_records(entity):
+    ent = _entity(entity)
+    fields = _projection(ent)
+    pk = ent["pk"]
+    limit = max(1, min(_int_arg("limit", DEFAULT_LIMIT), MAX_LIMIT))
+    after = _int_arg("after", None)
+
+    where, params = [], []
+    if after is not None:
+        where.append(f"{pk} > ?")
+        params.append(after)
+    for k, v in request.args.items():
+        if k in ent["fields"]:
+            where.append(f"{k} = ?")
+            params.append(v)
+
+    # always select the pk so the page cursor can be computed, even if projected away
+    cols = fields if pk in fields else fields + [pk]
+    sql = f"SELECT {','.join(cols)} FROM {ent['table']}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {pk} LIMIT ?"
+    with sqlite3.connect(ent["db"]) as conn:
+        rows = conn.execute(sql, params + [limit + 1]).fetchall()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    pk_pos = cols.index(pk)
+    data = [dict(zip(fields, r[:len(fields)])) for r in rows]
+    return json_response({
+        "data": data,
+        "next_after": rows[-1][pk_pos] if more else None,
+    })
+
+
+@api.route("/<entity>/<int:record_id>", methods=["GET"])
+def get_record(entity, record_id):
+    ent = _entity(entity)
+    fields = _projection(ent)
+    with sqlite3.connect(ent["db"]) as conn:
+        row = conn.execute(f"SELECT {','.join(fields)} FROM {ent['table']} WHERE {ent['pk']} = ?",
+                           (record_id,)).fetchone()
+    if not row:
+        raise ApiError("Not found.", 404)
+    return json_response({"data": dict(zip(fields, row))})
+
+# -------------------------
+# batch create / update / delete (one transaction each)
+# -------------------------
+def _claim_slot(cur, rec, doctor_id):
+    # like the booking forms: the slot must be free and belong to the doctor;
+    # check and take it in one statement so two batches can't both win
+    slot_id = rec.get("slot_id")
+    if not slot_id:
+        return
+    cur.execute("UPDATE doc.slot SET is_available = 0 WHERE slot_id = ? AND doctor_id = ? AND is_available = 1",
+                (slot_id, doctor_id))
+    if cur.rowcount == 0:
+        raise ApiError(f"Slot {slot_id} not available for doctor {doctor_id}.", 409)
+    _take_slot_time(cur, rec, slot_id)
+
+
+def _take_slot_time(cur, rec, slot_id):
+    # the appointment's date/time always come from its slot, as in the forms
+    slot_date, start_time = cur.execute("SELECT slot_date,start_time FROM doc.slot WHERE slot_id = ?",
+                                        (slot_id,)).fetchone()
+    if rec.get("appt_date", slot_date) != slot_date or rec.get("appt_time", start_time) != start_time:
+        raise ApiError(f"appt_date/appt_time must match slot {slot_id} ({slot_date} {start_time}).", 409)
+    rec["appt_date"], rec["appt_time"] = slot_date, start_time
+
+
+def _move_appointment(cur, rec):
+    row = cur.execute("SELECT slot_id,doctor_id FROM appointment WHERE appointment_id = ?",
+                      (rec["appointment_id"],)).fetchone()
+    if not row:
+        return  # reported as not found by the UPDATE
+    old_slot_id, old_doctor_id = row
+    doctor_id = rec.get("doctor_id", old_doctor_id)
+    new_slot_id = rec.get("slot_id", old_slot_id)
+    if new_slot_id != old_slot_id:
+        _claim_slot(cur, rec, doctor_id)
+        _free_slot(cur, old_slot_id)
+    elif new_slot_id and doctor_id != old_doctor_id:
+        # doctor changed but the slot didn't: the slot must already be theirs
+        owner = cur.execute("SELECT doctor_id FROM doc.slot WHERE slot_id = ?", (new_slot_id,)).fetchone()
+        if not owner or owner[0] != doctor_id:
+            raise ApiError(f"Slot {new_slot_id} does not belong to doctor {doctor_id}.", 409)
+    if new_slot_id == old_slot_id and new_slot_id and ("appt_date" in rec or "appt_time" in rec):
+        _take_slot_time(cur, rec, new_slot_id)
+
+
+def _check_booked_slot(cur, rec):
+    # a booked slot is held by an appointment (in appointment.db); moving it to
+    # another doctor or time would leave that appointment pointing at the wrong one
+    changing = [k for k in ("doctor_id", "slot_date", "start_time") if k in rec]
+    if not changing:
+        return
+    row = cur.execute("SELECT is_available FROM slot WHERE slot_id = ?", (rec["slot_id"],)).fetchone()
+    if row and row[0] == 0:
+        raise ApiError(f"Slot {rec['slot_id']} is booked; {', '.join(changing)} can't change.", 409)
+
+
+def _free_slot(cur, slot_id):
+    if slot_id:
+        cur.execute("UPDATE doc.slot SET is_available = 1 WHERE slot_id = ?", (slot_id,))
+
+
+@api.route("/<entity>/batch", methods=["POST"])
+def batch_create(entity):
+    ent = _entity(entity)
+    records = [_clean(ent, r) for r in _batch(ent)]
+    for i, rec in enumerate(records):
+        missing = [k for k in ent["required"] if rec.get(k) in (None, "")]
+        if missing:
+            raise ApiError(f"Record {i}: missing {', '.join(missing)}.")
+
+    ids = []
+    with _connect(ent) as conn:
+        cur = conn.cursor()
+        try:
+            for rec in records:
+                if ent["table"] == "appointment":
+                    _claim_slot(cur, rec, rec["doctor_id"])
+                    rec.setdefault("status", "CONFIRMED")
+                    rec.setdefault("created_at", datetime.utcnow().isoformat())
+                elif ent["table"] == "slot":
+                    rec["is_available"] = 1
+                cols = list(rec)
+                cur.execute(f"INSERT INTO {ent['table']} ({','.join(cols)}) VALUES ({','.join('?' * len(cols))})",
+                            [rec[c] for c in cols])
+                ids.append(cur.lastrowid)
+        except sqlite3.IntegrityError as e:
+            raise ApiError(f"Integrity error: {e}", 409)
+        except _DB_VALUE_ERRORS as e:
+            raise ApiError(f"Invalid value: {e}")
+    return json_response({"created": ids}, 201)
+
+
+@api.route("/<entity>/batch", methods=["PATCH"])
+def batch_update(entity):
+    ent = _entity(entity)
+    pk = ent["pk"]
+    records = [_clean(ent, r, allow_pk=True) for r in _batch(ent)]
+    for i, rec in enumerate(records):
+        if not isinstance(rec.get(pk), int):
+            raise ApiError(f"Record {i}: integer {pk} required.")
+        if len(rec) == 1:
+            raise ApiError(f"Record {i}: nothing to update.")
+        cleared = [k for k in ent["required"] if k in rec and rec[k] in (None, "")]
+        if cleared:
+            raise ApiError(f"Record {i}: {', '.join(cleared)} can't be empty.")
+
+    updated = 0
+    with _connect(ent) as conn:
+        cur = conn.cursor()
+        try:
+            for rec in records:
+                if ent["table"] == "appointment" and any(
+                        k in rec for k in ("slot_id", "doctor_id", "appt_date", "appt_time")):
+                    _move_appointment(cur, rec)
+                elif ent["table"] == "slot":
+                    _check_booked_slot(cur, rec)
+                cols = [c for c in rec if c != pk]
+                cur.execute(f"UPDATE {ent['table']} SET {','.join(c + '=?' for c in cols)} WHERE {pk} = ?",
+                            [rec[c] for c in cols] + [rec[pk]])
+                if cur.rowcount == 0:
+                    raise ApiError(f"{pk} {rec[pk]} not found.", 404)
+                updated += 1
+        except sqlite3.IntegrityError as e:
+            raise ApiError(f"Integrity error: {e}", 409)
+        except _DB_VALUE_ERRORS as e:
+            raise ApiError(f"Invalid value: {e}")
+    return json_response({"updated": updated})
+
+
+@api.route("/<entity>/batch", methods=["DELETE"])
+def batch_delete(entity):
+    ent = _entity(entity)
+    ids = _batch(ent)
+    if not all(isinstance(i, int) for i in ids):
+        raise ApiError("Body must be a JSON array of integer ids.")
+
+    deleted = 0
+    with _connect(ent) as conn:
+        cur = conn.cursor()
+        marks = ",".join("?" * len(ids))
+        if ent["table"] == "appointment":
+            for (slot_id,) in cur.execute(f"SELECT slot_id FROM appointment WHERE appointment_id IN ({marks})",
+                                          ids).fetchall():
+                _free_slot(cur, slot_id)
+        elif ent["table"] == "doctor":
+            cur.execute(f"DELETE FROM slot WHERE doctor_id IN ({marks})", ids)
+        elif ent["table"] == "slot":
+            booked = [r[0] for r in cur.execute(
+                f"SELECT slot_id FROM slot WHERE slot_id IN ({marks}) AND is_available = 0", ids)]
+            if booked:
+                raise ApiError(f"Slots are booked: {', '.join(map(str, booked))}.", 409)
+        cur.execute(f"DELETE FROM {ent['table']} WHERE {ent['pk']} IN ({marks})", ids)
+        deleted = cur.rowcount
+    return json_response({"deleted": deleted})
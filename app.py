@@ -2,13 +2,16 @@
 # Fusion Prime Care Hospital - complete backend (Flask + SQLite)
 # Save as app.py and run: python app.py
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
 import sqlite3
 import functools
 from datetime import datetime
 import secrets
+import analytics
+import profiler
+from api import api as api_v1
 
 app = Flask(__name__)
 app.secret_key = secrets.token_hex(32)  # Generate new secret key each run
@@ -39,13 +42,22 @@ def login_required(fn):
 @app.before_request
 def require_login():
     # allow access to login and static files only
-    if request.endpoint == 'login' or request.path.startswith('/static/'):
+    if request.endpoint in ('login', 'api_v1.login') or request.path.startswith('/static/'):
         return
     # require login for ALL other routes
     if not session.get("user"):
+        # API clients get a JSON 401 instead of the login page
+        if request.path.startswith('/api/v1/'):
+            return jsonify({"error": "Login required."}), 401
         flash("Please login to continue.", "danger")
         return redirect(url_for("login", next=request.path))
 
+# on-demand request profiling (see profiler.py)
+profiler.init_app(app)
+
+# JSON REST API (see api.py)
+app.register_blueprint(api_v1)
+
 # -------------------------
 # initialize DBs & tables
 # -------------------------
@@ -494,6 +506,17 @@ def api_slots():
     slots = [{"slot_id": r[0], "start_time": r[1], "end_time": r[2], "is_available": r[3]} for r in rows]
     return jsonify(slots)
 
+# -------------------------
+# report: doctor capacity & utilization (json)
+# -------------------------
+@app.route("/reports/utilization")
+@login_required
+def report_utilization():
+    start = request.args.get("start") or analytics.FIRST_DATE
+    end = request.args.get("end") or analytics.LAST_DATE
+    report = analytics.utilization_report(start, end, DOCTOR_DB, APPOINT_DB)
+    return jsonify(report)
+
 # -------------------------
 # appointments list / edit / delete
 # -------------------------
@@ -644,6 +667,30 @@ def edit_booking(appt_id):
                            doctors=doctors,
                            user=session.get("user"))
 
+# -------------------------
+# admin: captured request profiles
+# -------------------------
+@app.route("/admin/profiles")
+@login_required
+def admin_profiles():
+    if not profiler.is_admin():
+        flash("Admin access required.", "danger")
+        return redirect(url_for("dashboard"))
+    selected = request.args.get("file")
+    functions = profiler.top_functions(selected) if selected else []
+    return render_template("profiles.html", hospital_name=HOSPITAL_NAME, profiles=profiler.list_profiles(),
+                           selected=selected, functions=functions, sample_rate=profiler.PROFILE_SAMPLE_RATE,
+                           user=session.get("user"))
+
+@app.route("/admin/profiles/download/<path:name>")
+@login_required
+def download_profile(name):
+    path = profiler.profile_path(name) if profiler.is_admin() else None
+    if not path:
+        flash("Profile not found.", "danger")
+        return redirect(url_for("admin_profiles"))
+    return send_file(os.path.abspath(path), as_attachment=True, download_name=os.path.basename(path))
+
 # -------------------------
 # debug helper (show registered routes + templates)
 # -------------------------
@@ -656,7 +703,7 @@ def debug_routes_full():
         out.append(f"<li><code>{r.rule}</code> &rarr; <strong>{r.endpoint}</strong></li>")
     out.append("</ul><h3>Templates</h3><ul>")
     templates = ["base.html","login.html","dashboard.html","doctors.html","edit_doctor.html",
-                 "patients.html","edit_patient.html","booking.html","appointments.html","edit_appointment.html","edit_booking.html"]
+                 "patients.html","edit_patient.html","booking.html","appointments.html","edit_appointment.html","edit_booking.html","profiles.html"]
     for t in templates:
         out.append(f"<li>{t}: {'✅ exists' if os.path.exists(os.path.join('templates',t)) else '❌ NOT FOUND'}</li>")
     out.append("</ul>")
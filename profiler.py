@@ -0,0 +1,146 @@
+# profiler.py
+# Fusion Prime Care Hospital - on-demand request profiling (cProfile)
+#
+# A request is profiled when
+#   - a logged-in admin sends the header "X-Profile: 1" or the query flag ?_profile=1, or
+#   - the random sample hits PROFILE_SAMPLE_RATE (0.0 - 1.0, default 0 = off).
+# Each capture is written as a .pstats file under PROFILE_DIR/<endpoint>/ and
+# can be opened with `python -m pstats <file>` or snakeviz. The admin page
+# /admin/profiles lists the slowest captures.
+#
+# When nothing triggers, the per-request cost is one header/arg lookup (plus
+# one random() call when sampling is enabled).
+
+import cProfile
+import os
+import pstats
+import random
+import time
+from datetime import datetime
+
+from flask import g, request, session
+from werkzeug.security import safe_join
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(".", "profiles"))
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0") or 0)
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "50"))  # slowest files kept per endpoint
+ADMIN_USERS = {u.strip() for u in os.environ.get("PROFILE_ADMINS", "admin").split(",") if u.strip()}
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ARG = "_profile"
+
+
+def is_admin():
+    user = session.get("user")
+    return bool(user) and user.get("username") in ADMIN_USERS
+
+
+def _requested():
+    flag = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_ARG)
+    return bool(flag) and flag not in ("0", "false", "no") and is_admin()
+
+
+def _start():
+    if not (_requested() or (PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE)):
+        return
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+    except ValueError:
+        return  # another profiler already active in this thread
+    g._profiler = (prof, time.perf_counter())
+
+
+def _stop(response):
+    state = g.pop("_profiler", None)
+    if state is None:
+        return response
+    prof, t0 = state
+    prof.disable()
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    try:
+        _save(prof, request.endpoint or "unknown", elapsed_ms)
+    except OSError as e:
+        print("Profile save failed:", e)
+    response.headers["X-Profile-Ms"] = f"{elapsed_ms:.1f}"
+    return response
+
+
+def _abort(exc):
+    # after_request is skipped on unhandled errors; never leave a profiler running
+    state = g.pop("_profiler", None)
+    if state is not None:
+        state[0].disable()
+
+
+def _save(prof, endpoint, elapsed_ms):
+    folder = os.path.join(PROFILE_DIR, endpoint)
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    # elapsed time lives in the file name so listing never has to parse stats
+    name = f"{elapsed_ms:010.1f}ms-{stamp}-{os.getpid()}.pstats"
+    prof.dump_stats(os.path.join(folder, name))
+    _prune(folder)
+
+
+def _prune(folder):
+    files = sorted(f for f in os.listdir(folder) if f.endswith(".pstats"))
+    for f in files[:-PROFILE_KEEP] if PROFILE_KEEP > 0 else []:
+        try:
+            os.remove(os.path.join(folder, f))
+        except OSError:
+            pass
+
+
+def init_app(app):
+    app.before_request(_start)
+    app.after_request(_stop)
+    app.teardown_request(_abort)
+
+# -------------------------
+# admin listing
+# -------------------------
+def list_profiles(limit=50):
+    out = []
+    if not os.path.isdir(PROFILE_DIR):
+        return out
+    for endpoint in os.listdir(PROFILE_DIR):
+        folder = os.path.join(PROFILE_DIR, endpoint)
+        if not os.path.isdir(folder):
+            continue
+        for f in os.listdir(folder):
+            if not f.endswith(".pstats"):
+                continue
+            ms, stamp, _pid = f[:-len(".pstats")].split("-", 2)
+            out.append({
+                "endpoint": endpoint,
+                "file": f"{endpoint}/{f}",
+                "elapsed_ms": float(ms[:-2]),
+                "captured_at": datetime.strptime(stamp, "%Y%m%dT%H%M%S%f").strftime("%Y-%m-%d %H:%M:%S"),
+            })
+    out.sort(key=lambda p: p["elapsed_ms"], reverse=True)
+    return out[:limit]
+
+
+def profile_path(rel_path):
+    path = safe_join(PROFILE_DIR, rel_path)
+    if not path or not path.endswith(".pstats") or not os.path.isfile(path):
+        return None
+    return path
+
+
+def top_functions(rel_path, limit=25):
+    path = profile_path(rel_path)
+    if path is None:
+        return []
+    stats = pstats.Stats(path)
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _callers) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({func})",
+            "calls": nc,
+            "tottime_ms": round(tt * 1000, 3),
+            "cumtime_ms": round(ct * 1000, 3),
+        })
+    rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+    return rows[:limit]